@@ -1,23 +1,28 @@
 import os
+import asyncio
+import threading
+from contextlib import asynccontextmanager
 
 import torch
-import torch.nn.functional as F
-from transformers import AutoTokenizer, AutoModelForSequenceClassification
+from transformers import AutoTokenizer
 
-from fastapi import FastAPI
-from pydantic import BaseModel
-from generator import QuoteGenerator
-from typing import Dict
+from fastapi import FastAPI, HTTPException
+from pydantic import BaseModel, Field
+from generator import QuoteGenerator, is_quantized, load_classifier
+from typing import Dict, List, Tuple
 
 CLF_DIR = "./models/classifier"
 GENERATOR_DIR = "./models/generator"
 
-app = FastAPI()
+# Concurrent /classify requests are grouped into batches of up to MAX_BATCH texts,
+# waiting at most MAX_WAIT_MS for the batch to fill. A batch is one forward pass
+# unless the classifier is int8-quantized, see predict_top3.
+MAX_BATCH = 16
+MAX_WAIT_MS = 10
 
 tokenizer = AutoTokenizer.from_pretrained(CLF_DIR, use_fast=True)
-model = AutoModelForSequenceClassification.from_pretrained(CLF_DIR)
-model.eval()
-generator = QuoteGenerator(GENERATOR_DIR, CLF_DIR)
+model = load_classifier(CLF_DIR, "cpu")
+quantized = is_quantized(model)
 
 id2label = getattr(model.config, "id2label", None)
 
@@ -29,13 +34,73 @@ else:
               "Success", "Death", "Relationship", "Humorous", "Peace", "Fashion",
               "Courage", "Money"]
 
+def predict_top3(texts: List[str]) -> Tuple[List[List[int]], List[List[float]]]:
+    if quantized and len(texts) > 1:
+        # Each text gets its own forward pass, so its result does not depend on which
+        # requests it was batched with
+        per_text = [predict_top3([text]) for text in texts]
+        return [ids[0] for ids, _ in per_text], [probs[0] for _, probs in per_text]
+
+    tokenized_inputs = tokenizer(texts, padding=True, truncation=True, max_length=256, return_tensors="pt")
+    with torch.inference_mode():
+        logits = model(**tokenized_inputs).logits
+        # softmax is monotonic, so the top 3 logits are the top 3 probabilities
+        top3 = torch.topk(logits, k=3, dim=-1)
+        top3_probs = torch.softmax(logits, dim=-1).gather(-1, top3.indices)
+    return top3.indices.tolist(), top3_probs.tolist()  # shape: [batch, 3], descending
+
+
+async def batch_classifications(queue: asyncio.Queue):
+    loop = asyncio.get_running_loop()
+    while True:
+        batch = [await queue.get()]
+        deadline = loop.time() + MAX_WAIT_MS / 1000
+        while len(batch) < MAX_BATCH:
+            timeout = deadline - loop.time()
+            if timeout <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(queue.get(), timeout))
+            except asyncio.TimeoutError:
+                break
+
+        # The forward pass runs in a worker thread so the event loop keeps accepting requests
+        try:
+            top3_ids, top3_probs = await loop.run_in_executor(None, predict_top3, [text for text, _ in batch])
+        except Exception as e:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            continue
+
+        for (_, future), ids, probs in zip(batch, top3_ids, top3_probs):
+            if not future.done():  # the client may have gone away
+                future.set_result((ids, probs))
+
+
+classify_queue: asyncio.Queue | None = None
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    global classify_queue
+    classify_queue = asyncio.Queue()
+    batcher = asyncio.create_task(batch_classifications(classify_queue))
+    # Load the generator in the background so startup is not blocked and the first
+    # /generate request does not pay for loading and compiling the models
+    asyncio.get_running_loop().run_in_executor(None, get_generator)
+    yield
+    batcher.cancel()
+
+app = FastAPI(lifespan=lifespan)
+
 class Input(BaseModel):
     text: str
 
 class GenerateRequest(BaseModel):
     topic: str
     min_confidence: float = 0.6
-    max_attempts: int = 5
+    # All attempts are sampled as one batch, so the batch size is bounded here
+    max_attempts: int = Field(5, ge=1, le=16)
     temperature: float = 0.8
     top_p: float = 0.9
     max_length: int = 40
@@ -53,31 +118,40 @@ def health():
     return {"status": "ok", "model_loaded": True, "num_labels": len(labels)}
 
 @app.post("/classify")
-def classify(user_input: Input) -> Dict:
-    tokenized_inputs = tokenizer(user_input.text, padding=True, truncation=True, max_length=256, return_tensors="pt")
-    with torch.no_grad():
-        logits = model(**tokenized_inputs).logits
-    probs = torch.softmax(logits, dim=-1).cpu().numpy()[0]  # shape: [num_labels]
-    top3_indices = probs.argsort()[-3:][::-1]  # top 3 in descending order
-    top, second, third = top3_indices
+async def classify(user_input: Input) -> Dict:
+    future = asyncio.get_running_loop().create_future()
+    await classify_queue.put((user_input.text, future))
+    top3_ids, top3_probs = await future  # top 3 in descending order
     return {
-        "label": id2label[top],
-        "probs": {
-            id2label[top]: round(float(probs[top]), 4),
-            id2label[second]: round(float(probs[second]), 4),
-            id2label[third]: round(float(probs[third]), 4)
-        },
+        "label": id2label[top3_ids[0]],
+        "probs": {id2label[i]: round(p, 4) for i, p in zip(top3_ids, top3_probs)},
         "model_version": os.getenv("MODEL_VERSION", "v1")
     }
 
+# The generator loads a second pair of models; the lock makes concurrent callers wait
+# for the one being built instead of each loading their own
+generator: QuoteGenerator | None = None
+generator_lock = threading.Lock()
+
+def get_generator() -> QuoteGenerator:
+    global generator
+    with generator_lock:
+        if generator is None:
+            generator = QuoteGenerator(GENERATOR_DIR, CLF_DIR)
+        return generator
+
 @app.post("/generate", response_model=GenerateResponse)
 def generate_quote(req: GenerateRequest):
-    result = generator.generate(
-        topic=req.topic,
-        min_confidence=req.min_confidence,
-        max_attempts=req.max_attempts,
-        temperature=req.temperature,
-        top_p=req.top_p,
-        max_length=req.max_length,
-    )
+    quote_generator = get_generator()
+    try:
+        result = quote_generator.generate(
+            topic=req.topic,
+            min_confidence=req.min_confidence,
+            max_attempts=req.max_attempts,
+            temperature=req.temperature,
+            top_p=req.top_p,
+            max_length=req.max_length,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     return result
@@ -0,0 +1,10 @@
+from optimum.onnxruntime import ORTModelForSequenceClassification, ORTModelForSeq2SeqLM
+
+CLF_DIR = "./models/classifier"
+GENERATOR_DIR = "./models/generator"
+
+# The ONNX graphs are written next to the PyTorch weights; app.py and QuoteGenerator
+# serve a model with ONNX Runtime whenever its directory contains them.
+if __name__ == "__main__":
+    ORTModelForSequenceClassification.from_pretrained(CLF_DIR, export=True).save_pretrained(CLF_DIR)
+    ORTModelForSeq2SeqLM.from_pretrained(GENERATOR_DIR, export=True).save_pretrained(GENERATOR_DIR)
@@ -0,0 +1,24 @@
+from typing import List, Sequence
+
+import numpy as np
+
+
+def stratified_split(labels: Sequence, fractions: Sequence[float], seed: int) -> List[np.ndarray]:
+    # The indices of every label are shuffled once and cut at the same fractions, so each
+    # part keeps the label proportions. The last part gets whatever is left.
+    rng = np.random.default_rng(seed)
+    _, codes = np.unique(np.asarray(labels), return_inverse=True)
+    order = np.argsort(codes, kind="stable")
+    groups = np.split(order, np.flatnonzero(np.diff(codes[order])) + 1)
+
+    parts = [[] for _ in range(len(fractions) + 1)]
+    for group in groups:
+        rng.shuffle(group)
+        cuts = np.round(np.cumsum(fractions) * len(group)).astype(int)
+        for part, indices in zip(parts, np.split(group, cuts)):
+            part.append(indices)
+
+    splits = [np.concatenate(part) for part in parts]
+    for split in splits:
+        rng.shuffle(split)
+    return splits
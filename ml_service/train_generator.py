@@ -9,11 +9,11 @@ from typing import Dict, List
 import numpy as np
 import pandas as pd
 import torch
-from sklearn.model_selection import train_test_split
+from splitting import stratified_split
 
 from datasets import Dataset
 from transformers import (
-    T5Tokenizer,
+    AutoTokenizer,
     T5ForConditionalGeneration,
     Trainer,
     TrainingArguments,
@@ -48,14 +48,14 @@ def build_prompt(topic: str) -> str:
 df["input_text"] = df["topic"].apply(build_prompt)
 df["target_text"] = df["quote"]
 
-train_df, val_df = train_test_split(df, train_size=TRAIN_RATIO, random_state=SEED, shuffle=True, stratify=df["topic"])
-val_df, test_df = train_test_split(val_df, train_size=VAL_RATIO, random_state=SEED, shuffle=True, stratify=val_df["topic"])
+train_idx, val_idx, test_idx = stratified_split(df["topic"], (TRAIN_RATIO, (1 - TRAIN_RATIO) * VAL_RATIO), seed=SEED)
+train_df, val_df, test_df = df.take(train_idx), df.take(val_idx), df.take(test_idx)
 
 train_ds = Dataset.from_pandas(train_df[["input_text", "target_text"]])
 val_ds = Dataset.from_pandas(val_df[["input_text", "target_text"]])
 test_ds = Dataset.from_pandas(test_df[["input_text", "target_text"]])
 
-tokenizer = T5Tokenizer.from_pretrained(MODEL_NAME)
+tokenizer = AutoTokenizer.from_pretrained(MODEL_NAME, use_fast=True)
 model = T5ForConditionalGeneration.from_pretrained(MODEL_NAME)
 
 def tokenize(batch: Dict[str, List[str]]) -> Dict[str, torch.Tensor]:
@@ -67,20 +67,19 @@ def tokenize(batch: Dict[str, List[str]]) -> Dict[str, torch.Tensor]:
         return_tensors="pt",
         )
 
-    with tokenizer.as_target_tokenizer():
-        targets = tokenizer(
-            batch["target_text"],
-            padding="max_length",
-            truncation=True,
-            max_length=MAX_TARGET_LEN,
-            return_tensors="pt",
-        )
+    targets = tokenizer(
+        text_target=batch["target_text"],
+        padding="max_length",
+        truncation=True,
+        max_length=MAX_TARGET_LEN,
+        return_tensors="pt",
+    )
 
     inputs["labels"] = targets["input_ids"]
     return inputs
 
-train_tok = train_ds.map(tokenize, batched=True, remove_columns=train_ds.column_names)
-val_tok = val_ds.map(tokenize, batched=True, remove_columns=val_ds.column_names)
+train_tok = train_ds.map(tokenize, batched=True, batch_size=1000, num_proc=os.cpu_count(), remove_columns=train_ds.column_names)
+val_tok = val_ds.map(tokenize, batched=True, batch_size=1000, num_proc=os.cpu_count(), remove_columns=val_ds.column_names)
 
 train_tok.set_format("torch")
 val_tok.set_format("torch")
@@ -1,6 +1,26 @@
 from base_scraper import BaseScraper
+import sys
 from string import ascii_lowercase
+import asyncio
 from concurrent.futures import ThreadPoolExecutor, as_completed
+from itertools import chain
+from lxml import etree
+from lxml.html import HtmlElement
+
+def _has_class(name: str) -> str:
+    """Builds an XPath predicate matching one token of the class attribute, like bs4's `class_=`."""
+    return f"contains(concat(' ', normalize-space(@class), ' '), ' {name} ')"
+
+# Compiled once at import so every block lookup runs inside libxml2
+_BLOCKS = etree.XPath(f".//div[{_has_class('wrap-block')}]")
+_QUOTE = etree.XPath(f"string(.//a[{_has_class('title')}])", smart_strings=False)
+_AUTHOR = etree.XPath(f"(.//div[{_has_class('author')}])[1]")
+_TAGS = etree.XPath(f"(.//div[{_has_class('mytags')}])[1]//a")
+_TEXT = etree.XPath("string()", smart_strings=False)
+_LIKES = etree.XPath(
+    f"string((.//div[{_has_class('share-icons')}])[1]//a[{_has_class('heart24')} and {_has_class('heart24-off')}])",
+    smart_strings=False,
+)
 
 class AzQuoteScraper(BaseScraper):
     """
@@ -12,9 +32,25 @@ class AzQuoteScraper(BaseScraper):
     - Scraping author details with multi-threading
     - Handling pagination for multiple pages
     - Saving extracted data as JSON or pickle
+
+    Attributes:
+        BASE_URL (str): The root of the site, prefixed to the relative links it serves.
+        TAGS_TMPL (str): The URL template of the topics index of a letter.
+        AUTHORS_TMPL (str): The URL template of the authors index of a letter.
     """
 
-    def scrape_page(self, url: str, save: bool = False, savepath: str = "Az_quotes.pkl") -> list:
+    BASE_URL = 'https://www.azquotes.com'
+    TAGS_TMPL = 'https://www.azquotes.com/quotes/tags/{}/'
+    AUTHORS_TMPL = 'https://www.azquotes.com/quotes/authors/{}/'
+
+    def __init__(self):
+        """
+        Initializes the scraper session and an empty cache of page counts per base URL.
+        """
+        super().__init__()
+        self._num_of_pages = {}
+
+    def scrape_page(self, url: str, save: bool = False, savepath: str = "Az_quotes.pkl") -> dict:
         """
         Scrapes a single page for quotes and extracts relevant information.
 
@@ -24,82 +60,67 @@ class AzQuoteScraper(BaseScraper):
             savepath (str): The path to save the data. Must be a .pkl or .json file
 
         Returns:
-            list: A list of dictionaries containing quote data.
+            dict: A columnar batch of quote data, see `to_dicts` to get one dictionary per quote.
         """
         page = self.get_page(url)
-        soup = self.parse_page(page)
-        quotes = []
-        for block in soup.find_all('div', class_='wrap-block'):
-            quotes.append({
-                'quote': self.get_quote(block),
-                'author': self.get_author(block),
-                'tags': self.get_tags(block),
-                'likes': self.get_likes(block)
-            })
+        quotes = _extract_quotes(page)
 
         if save:
             self._save(quotes, savepath)        
         return quotes
     
     @staticmethod
-    def get_quote(block) -> str:
+    def get_quote(block: HtmlElement) -> str:
         """
         Extracts the quote text from a quote block.
 
         Args:
-            block (BeautifulSoup element): The block containing the quote.
+            block (lxml element): The block containing the quote.
 
         Returns:
             str: The extracted quote text.
         """
-        return block.find('a', class_='title').get_text()
+        return _QUOTE(block)
     
     @staticmethod
-    def get_author(block) -> str:
+    def get_author(block: HtmlElement) -> str:
         """
         Extracts the author of the quote.
 
         Args:
-            block (BeautifulSoup element): The block containing the author.
+            block (lxml element): The block containing the author.
 
         Returns:
             str: The extracted author name, or 'Unknown' if not found.
         """
-        author_tag = block.find('div', class_='author')
-        return author_tag.get_text(strip=True) if author_tag else 'Unknown'
+        author = _AUTHOR(block)
+        return sys.intern(AzQuoteScraper.stripped_text(author[0]) if author else 'Unknown')
     
     @staticmethod
-    def get_tags(block) -> list:
+    def get_tags(block: HtmlElement) -> list:
         """
         Extracts the tags associated with a quote.
 
         Args:
-            block (BeautifulSoup element): The block containing tags.
+            block (lxml element): The block containing tags.
 
         Returns:
             list: A list of tag strings.
         """
-        tags = []
-        tags_block = block.find('div', class_='mytags')
-        if tags_block:
-            for tag in tags_block.find_all('a'):
-                tags.append(tag.get_text())
-        return tags
+        return [sys.intern(_TEXT(tag)) for tag in _TAGS(block)]
     
     @staticmethod
-    def get_likes(block) -> str:
+    def get_likes(block: HtmlElement) -> str:
         """
         Extracts the number of likes for a quote.
 
         Args:
-            block (BeautifulSoup element): The block containing likes.
+            block (lxml element): The block containing likes.
 
         Returns:
             str: The number of likes as a string.
         """
-        icons = block.find('div', class_='share-icons')
-        like_tag = icons.find('a', class_='heart24 heart24-off') if icons else None
-        return like_tag.get_text() if like_tag else '0'
+        return _LIKES(block) or '0'
     
     def scrape_topics_by_letter(self, letter: str, save: bool = False, savepath: str = "Az_topics_by_letter.pkl") -> list:
         """
@@ -112,28 +133,43 @@ class AzQuoteScraper(BaseScraper):
         Returns:
             list: A list of dictionaries containing topic names and URLs.
         """
-        url = f'https://www.azquotes.com/quotes/tags/{letter}/'
-        quote_url = 'https://www.azquotes.com'
-
-        topics = []
+        url = self.TAGS_TMPL.format(letter)
         response = self.get_page(url)
-        soup = self.parse_page(response)
-        soup = soup.find('section', class_='authors-page')
-        for topic in soup.find_all('li'):
-            topic_of_quote = topic.find('a').get_text(strip=True)
-            topic_url = topic.find('a').get('href')
-            if topic_of_quote:
-                topics.append({'topic': topic_of_quote, 'url': quote_url + topic_url})
+        topics = self._parse_topics_page(self.parse_fast(response))
 
         if save:
             self._save(topics, savepath)
 
         return topics
+
+    def _parse_topics_page(self, tree) -> list:
+        """
+        Reads the topics listed on a parsed topics index page.
+
+        Args:
+            tree (LexborHTMLParser): The page parsed with `parse_fast`.
+
+        Returns:
+            list: A list of dictionaries containing topic names and URLs.
+        """
+        topics = []
+        for link in tree.css('section.authors-page li a'):
+            topic_of_quote = link.text(strip=True)
+            topic_url = link.attributes.get('href') or ''
+            if not topic_url.startswith('http'):
+                topic_url = self.BASE_URL + topic_url
+            if topic_of_quote:
+                topics.append({'topic': topic_of_quote, 'url': topic_url})
+
+        return topics
     
     def scrape_topics(self, save: bool = False, savepath: str = "Az_topics.pkl") -> list:
         """
         Scrapes all available topics from AZQuotes.
 
+        This is a synchronous wrapper around `scrape_topics_async` and cannot be
+        called from within a running event loop.
+
         Args:
             save (bool): If True, saves the data to a pickle file.
             savepath (str): The path to save the data. Must be a .pkl or .json file
@@ -141,17 +177,31 @@ class AzQuoteScraper(BaseScraper):
         Returns:
             list: A list of topic dictionaries.
         """
-        topics = []
-        with ThreadPoolExecutor(max_workers=10) as executor:
-            futures = [executor.submit(self.scrape_topics_by_letter, letter) for letter in ascii_lowercase]
-
-            for future in as_completed(futures):
-                topics.extend(future.result())
+        topics = asyncio.run(self.scrape_topics_async())
 
         if save:
             self._save(topics, savepath)
 
         return topics
+
+    async def scrape_topics_async(self) -> list:
+        """
+        Asynchronously scrapes all available topics from AZQuotes.
+
+        The index pages of all letters are requested at once on one event loop, so the
+        whole index costs about one round trip instead of one per letter.
+
+        Returns:
+            list: A list of topic dictionaries, ordered by letter.
+        """
+        async def topics_of(letter, session):
+            page = await self._aget(self.TAGS_TMPL.format(letter), session)
+            return self._parse_topics_page(self.parse_fast(page))
+
+        async with self.async_session() as session:
+            by_letter = await asyncio.gather(*(topics_of(letter, session) for letter in ascii_lowercase))
+
+        return [topic for topics in by_letter for topic in topics]
     
     def scrape_authors_page(self, letter: str, number: int, save: bool = False, savepath: str = "Az_authors.pkl") -> list:
         """
@@ -166,50 +216,73 @@ class AzQuoteScraper(BaseScraper):
         Returns:
             list: A list of dictionaries containing author data.
         """
-        url = f'https://www.azquotes.com/quotes/authors/{letter}/{number}'
-        quote_url = 'https://www.azquotes.com'
-
-        authors_of_page = []
+        url = self.AUTHORS_TMPL.format(letter) + str(number)
         response = self.get_page(url)
-        soup = self.parse_page(response)
-        table_body = soup.find('tbody')
-
-        for row in table_body.find_all('tr'):
-            columns = row.find_all('td')
-            author_url = row.find('a').get('href')
-            author_url = quote_url + author_url
-            name, profession, birthday = [column.text.strip() for column in columns]
-            authors_of_page.append({'name': name, 'url': author_url, 'profession': profession, 'birthday': birthday})
+        authors_of_page, _ = self._parse_authors_page(self.parse_fast(response), url)
 
         if save:
             self._save(authors_of_page, savepath)
 
         return authors_of_page
-    
-    def __find_num_of_pages(self, url: str) -> int:
+
+    def _parse_authors_page(self, tree, url: str) -> tuple:
         """
-        Determines the number of available pages for a given URL.
+        Extracts both the author rows and the pager count from a parsed authors page.
 
         Args:
-            url (str): The URL to check.
+            tree (LexborHTMLParser): The parsed authors page.
+            url (str): The URL the page was fetched from, used for error reporting.
 
         Returns:
-            int: The number of pages available.
+            tuple: A list of author dictionaries and the number of pages available.
         """
-        response = self.get_page(url)
-        soup = self.parse_page(response)
-        pager_div = soup.find('div', class_='pager')
-        if not pager_div:
+        authors_of_page = []
+        for row in tree.css('tbody tr'):
+            columns = row.css('td')
+            author_url = row.css_first('a').attributes['href']
+            author_url = self.BASE_URL + author_url
+            name, profession, birthday = [column.text().strip() for column in columns]
+            authors_of_page.append({'name': name, 'url': author_url, 'profession': profession, 'birthday': birthday})
+
+        return authors_of_page, self._read_pager(tree, url)
+
+    @staticmethod
+    def _read_pager(tree, url: str) -> int:
+        """
+        Reads the number of pages from the pager of a parsed page.
+
+        Args:
+            tree (LexborHTMLParser): The parsed page.
+            url (str): The URL the page was fetched from, used for error reporting.
+
+        Returns:
+            int: The number of pages available, or 1 if there is no pager.
+        """
+        page_span = tree.css_first('div.pager span')
+        if page_span is None:
             return 1
-        page_spans = pager_div.find('span')
         try:
-            num_of_pages = int(page_spans.get_text().split(' ')[-1])
+            num_of_pages = int(page_span.text().split(' ')[-1])
         except ValueError:
             print(f"Could not extract number of pages for page {url}")
             num_of_pages = 1
 
         return num_of_pages
-    
+
+    def _scrape_first_authors_page(self, letter: str) -> tuple:
+        """
+        Fetches and parses the first authors page of a letter once.
+
+        Args:
+            letter (str): The letter for author names.
+
+        Returns:
+            tuple: A list of author dictionaries and the number of pages for the letter.
+        """
+        url = self.AUTHORS_TMPL.format(letter) + '1'
+        response = self.get_page(url)
+        return self._parse_authors_page(self.parse_fast(response), url)
+
     def scrape_authors(self, save: bool = False, savepath: str = "Az_authors.pkl") -> list:
         """
         Scrapes all authors listed on AZQuotes.
@@ -222,29 +295,32 @@ class AzQuoteScraper(BaseScraper):
             list: A list of author dictionaries.
         """
         authors = []
-        with ThreadPoolExecutor(max_workers=10) as executor:
+        with ThreadPoolExecutor(max_workers=self.MAX_WORKERS) as executor:
+            # Page 1 of every letter yields both its authors and the page count,
+            # so the remaining pages are dispatched as soon as it arrives
+            first_pages = {executor.submit(self._scrape_first_authors_page, letter): letter for letter in ascii_lowercase}
             futures = []
-            for letter in ascii_lowercase:
-                author_letter_url = f'https://www.azquotes.com/quotes/authors/{letter}/'
-                num_of_pages = self.__find_num_of_pages(author_letter_url + '1')
+            for future in as_completed(first_pages):
+                letter = first_pages[future]
+                authors_of_page, num_of_pages = future.result()
+                authors.extend(authors_of_page)
+                for i in range(2, num_of_pages + 1):
+                    futures.append(executor.submit(self.scrape_authors_page, letter, i))
 
-                for i in range(1, int(num_of_pages) + 1):
-                    future = executor.submit(self.scrape_authors_page, letter, i)
-                    futures.append(future)
-
-            for future in as_completed(futures):
-                authors.extend(future.result())
+            # Every page is already submitted, so collecting them in submission order costs
+            # no extra time and keeps the authors of a letter in page order
+            authors.extend(chain.from_iterable(future.result() for future in futures))
 
         if save:
             self._save(authors, savepath)
         return authors
     
-    def scrape_many_pages(self, urls: list, start_page: int, end_page: int, save: bool = False, savepath: str = "Az_quotes.pkl") -> list:
+    def scrape_many_pages(self, urls: list, start_page: int, end_page: int, save: bool = False, savepath: str = "Az_quotes.pkl", stream: bool = False):
         """
         Scrapes multiple paginated URLs concurrently and extracts quotes.
 
-        This method handles pagination dynamically, submitting scraping tasks 
-        for each page across multiple URLs using threading.
+        This is a synchronous wrapper around `scrape_many_pages_async` and cannot be
+        called from within a running event loop.
 
         Args:
             urls (list): A list of base URLs to scrape.
@@ -252,29 +328,66 @@ class AzQuoteScraper(BaseScraper):
             end_page (int): The last page number to scrape.
             save (bool): If True, saves the extracted data to a file.
             savepath (str): The path to save the data. Must be a .pkl or .json file.
+            stream (bool): If True, quotes are appended to `savepath` as JSON Lines while pages
+                complete instead of being kept in memory, and `save` is ignored. `savepath`
+                must then be a .jsonl file.
 
         Returns:
-            list: A list of dictionaries containing quote data from all pages.
+            dict | str: A columnar batch of quote data from all pages, or the path of the
+            written file when streaming.
         """
-        quotes = []
-        futures = []
-        len_urls = len(urls)
-        with ThreadPoolExecutor(max_workers=10) as executor:
-            for i, url in enumerate(urls):
-                print(i, '/', len_urls)
-                for page in self.__generate_pages(url, start_page, end_page):
-                    future = executor.submit(self.scrape_page, page)
-                    futures.append(future)
+        if stream:
+            with self._open_stream(savepath) as f:
+                asyncio.run(self.scrape_many_pages_async(urls, start_page, end_page, stream_to=f))
+            return f.name
 
-            for future in as_completed(futures):
-                quotes.extend(future.result())
+        quotes = asyncio.run(self.scrape_many_pages_async(urls, start_page, end_page))
 
         if save:
             self._save(quotes, savepath)
 
         return quotes
+
+    async def scrape_many_pages_async(self, urls: list, start_page: int, end_page: int, stream_to=None) -> dict:
+        """
+        Asynchronously scrapes multiple paginated URLs and extracts quotes.
+
+        All pages are fetched concurrently on one event loop, bounded by the connector
+        limits of `async_session`. Parsing is CPU bound, so each page is handed to a
+        process pool and extracted on a separate core.
+
+        Args:
+            urls (list): A list of base URLs to scrape.
+            start_page (int): The starting page number for pagination.
+            end_page (int): The last page number to scrape.
+            stream_to (file, optional): A file opened by `_open_stream`. If given, each
+                page's quotes are written to it as soon as they are extracted instead of
+                being collected.
+
+        Returns:
+            dict: A columnar batch of quote data from all pages, empty when streaming.
+        """
+        async def pages_of(url, session):
+            if url in self._num_of_pages:
+                num_of_pages = self._num_of_pages[url]
+            else:
+                page = await self._aget(url, session)
+                if page:
+                    num_of_pages = self._read_pager(self.parse_fast(page), url)
+                    self._num_of_pages[url] = num_of_pages
+                else:
+                    # Only page 1 is tried now; the count is looked up again on the next call
+                    num_of_pages = 1
+            return list(self.__generate_pages(url, start_page, end_page, num_of_pages))
+
+        async with self.async_session() as session:
+            paginated = await asyncio.gather(*(pages_of(url, session) for url in urls))
+            pages = [page_url for url_pages in paginated for page_url in url_pages]
+            quotes = await self._scrape_pages_async(pages, _extract_quotes, session, stream_to=stream_to)
+
+        return quotes
     
-    def __generate_pages(self, url: str, start_page: int, end_page: int):
+    def __generate_pages(self, url: str, start_page: int, end_page: int, num_of_pages: int):
         """
         Generates a list of paginated URLs for a given base URL.
 
@@ -285,13 +398,33 @@ class AzQuoteScraper(BaseScraper):
             url (str): The base URL for pagination.
             start_page (int): The starting page number.
             end_page (int): The last page number to scrape.
+            num_of_pages (int): The number of pages available for the URL.
 
         Returns:
             list: A list of fully constructed paginated URLs.
         """
-        num_of_pages = self.__find_num_of_pages(url)
         end_page = num_of_pages if end_page > num_of_pages else end_page
         base_url = f'{url}?p='
         for i in range(start_page, end_page + 1):
             yield base_url + str(i)
-    
+
+
+def _extract_quotes(page: str) -> dict:
+    """
+    Extracts every quote block from the HTML of an AZQuotes page.
+
+    Kept at module level so it can be pickled and run inside a process pool.
+
+    Args:
+        page (str): The HTML content as a string.
+
+    Returns:
+        dict: A columnar batch of quote data.
+    """
+    quotes = BaseScraper._empty_batch()
+    for block in _BLOCKS(AzQuoteScraper.parse_tree(page)):
+        quotes['quote'].append(AzQuoteScraper.get_quote(block))
+        quotes['author'].append(AzQuoteScraper.get_author(block))
+        quotes['tags'].append(AzQuoteScraper.get_tags(block))
+        quotes['likes'].append(AzQuoteScraper.get_likes(block))
+    return quotes
@@ -1,11 +1,27 @@
+import asyncio
+import aiohttp
 import requests
+import requests_cache
 from requests.adapters import HTTPAdapter
+from urllib3.util.request import ACCEPT_ENCODING
 from urllib3.util.retry import Retry
-from bs4 import BeautifulSoup
+import lxml.etree
+import lxml.html
+from selectolax.lexbor import LexborHTMLParser
 import logging
+import threading
+from urllib.parse import urlparse
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
 import json
+from collections import namedtuple
+try:
+    import msgspec
+except ImportError:  # msgspec has no PyPy build
+    msgspec = None  # type: ignore[assignment]
 import pickle
-from datetime import datetime
+from datetime import datetime, timedelta
 
 # Configure logging
 logging.basicConfig(
@@ -16,6 +32,23 @@ logging.basicConfig(
     ]
 )
 
+_QUOTE_FIELDS = ('quote', 'author', 'tags', 'likes')
+_TIMESTAMP_FORMAT = '%m_%d_%Y_%H%M%S'
+# (connect, read) timeouts in seconds, so unreachable hosts fail fast
+_TIMEOUT = (5, 25)
+# Retry policy shared by the synchronous session and `_aget`
+_RETRIES = 3
+_BACKOFF = 0.5
+_RETRY_STATUSES = frozenset([500, 502, 503, 504])
+
+# A single scraped quote. msgspec structs are slotted and much cheaper to create
+# and hold than dicts; PyPy falls back to a namedtuple.
+if msgspec is not None:
+    Quote = msgspec.defstruct('Quote', _QUOTE_FIELDS)
+    _JSON_ENCODER = msgspec.json.Encoder()
+else:
+    Quote = namedtuple('Quote', _QUOTE_FIELDS)  # type: ignore[misc, no-redef]
+
 class BaseScraper:
     """
     A base scraper class that provides essential web scraping functionalities.
@@ -23,21 +56,52 @@ class BaseScraper:
     This class sets up a session with retry mechanisms, handles page requests,
     parsing, and provides methods for saving scraped data. It is meant to be 
     subclassed, requiring child classes to implement specific parsing methods.
+
+    Attributes:
+        MAX_PER_HOST (int): The maximum number of concurrent requests to a single host.
+        MAX_WORKERS (int): The number of threads fetching pages concurrently through the session.
     """
-    
+
+    MAX_PER_HOST = 8
+    MAX_WORKERS = 10
+
     def __init__(self):
         """
-        Initializes the scraper session with a User-Agent header and retry mechanism.
+        Initializes the scraper session with User-Agent and compression headers and a retry mechanism.
         
-        The retry mechanism will attempt failed requests up to 5 times with an increasing
-        backoff factor of 5 seconds.
+        The retry mechanism will retry failed GET requests up to 3 times on server errors,
+        with an increasing backoff factor of 0.5 seconds or as long as a Retry-After header
+        asks. Client errors are not retried. Retries are kept short because requests are also
+        throttled to `MAX_PER_HOST` concurrent requests per host. Connections are pooled per host for both HTTP and
+        HTTPS, sized so the `MAX_WORKERS` scraping threads keep their sockets alive
+        instead of reopening them.
+
+        Successful responses are cached in a local SQLite database for a day, so repeated
+        requests for the same URL, within a run or across runs, skip the network.
         """
-        self.session = requests.Session()
+        self.session = requests_cache.CachedSession(
+            'scraper_cache',
+            backend='sqlite',
+            expire_after=timedelta(days=1),
+            allowable_codes=(200,),
+        )
         self.session.headers.update({
-            "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/119.0.0.0 Safari/537.36"
+            "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/119.0.0.0 Safari/537.36",
+            # urllib3 only lists br when brotli or brotlicffi can be imported
+            "Accept-Encoding": ACCEPT_ENCODING
         })
-        retries = Retry(total=5, backoff_factor=5, status_forcelist=[400, 500, 502, 503, 504])
-        self.session.mount("https://", HTTPAdapter(max_retries=retries))
+        retries = Retry(
+            total=_RETRIES,
+            backoff_factor=_BACKOFF,
+            status_forcelist=_RETRY_STATUSES,
+            allowed_methods=frozenset(['GET']),
+            respect_retry_after_header=True,
+        )
+        adapter = HTTPAdapter(pool_connections=32, pool_maxsize=max(64, self.MAX_WORKERS), max_retries=retries)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self._host_semaphores = {}
+        self._host_lock = threading.Lock()
 
     def get_page(self, url: str) -> str:
         """
@@ -50,26 +114,246 @@ class BaseScraper:
             str: The HTML content of the page as a string, or an empty string if the request fails.
         """
         try:
-            page = self.session.get(url, timeout=30)
+            with self._host_semaphore(url):
+                page = self.session.get(url, timeout=_TIMEOUT)
             page.raise_for_status()
             logging.info('Scrape page %s is finished', url)
+            # Without a charset requests falls back to ISO-8859-1 for text/html; decode as
+            # UTF-8 instead, as `_aget` does
+            if 'charset' not in page.headers.get('Content-Type', ''):
+                page.encoding = 'utf-8'
             return page.text
         except requests.RequestException as e:
             logging.error("Error fetching page: %s", e)
             return ''
-        
-    def parse_page(self, page: str) -> BeautifulSoup:
+
+    def _host_semaphore(self, url: str) -> threading.BoundedSemaphore:
+        """
+        Returns the semaphore limiting concurrent requests to the host of a URL.
+
+        Args:
+            url (str): The URL about to be requested.
+
+        Returns:
+            threading.BoundedSemaphore: The semaphore shared by all requests to the host.
+        """
+        host = urlparse(url).netloc
+        with self._host_lock:
+            if host not in self._host_semaphores:
+                self._host_semaphores[host] = threading.BoundedSemaphore(self.MAX_PER_HOST)
+            return self._host_semaphores[host]
+
+    def async_session(self) -> aiohttp.ClientSession:
+        """
+        Creates an aiohttp session mirroring the headers of the synchronous session.
+
+        The connector caps the number of in-flight requests at 64 overall and
+        `MAX_PER_HOST` per host, keeps idle connections open for 75 seconds and caches
+        resolved hosts for 5 minutes instead of aiohttp's default 10 seconds.
+        Connecting shares the connect timeout of the synchronous session. Must be called
+        from within a running event loop.
+
+        Returns:
+            aiohttp.ClientSession: The session to pass to `_aget`.
+        """
+        return aiohttp.ClientSession(
+            headers=dict(self.session.headers),
+            connector=aiohttp.TCPConnector(limit=64, limit_per_host=self.MAX_PER_HOST, keepalive_timeout=75, ttl_dns_cache=300),
+            timeout=aiohttp.ClientTimeout(total=30, sock_connect=_TIMEOUT[0]),
+        )
+
+    async def _aget(self, url: str, session: aiohttp.ClientSession) -> str:
+        """
+        Asynchronously fetches the HTML content of a given URL.
+
+        Server errors, dropped connections and timeouts are retried with the same policy
+        as the synchronous session: up to 3 times, with an increasing backoff factor of
+        0.5 seconds or as long as a Retry-After header asks.
+
+        Args:
+            url (str): The URL of the webpage to be scraped.
+            session (aiohttp.ClientSession): The session created by `async_session`.
+
+        Returns:
+            str: The HTML content of the page as a string, or an empty string if the request fails.
         """
-        Parses the HTML content using BeautifulSoup.
+        for attempt in range(_RETRIES + 1):
+            delay = _BACKOFF * 2 ** attempt
+            try:
+                async with session.get(url) as page:
+                    if page.status not in _RETRY_STATUSES or attempt == _RETRIES:
+                        page.raise_for_status()
+                        text = await page.text(encoding=page.charset or 'utf-8', errors='replace')
+                        logging.info('Scrape page %s is finished', url)
+                        return text
+                    retry_after = page.headers.get('Retry-After', '')
+                    if retry_after.isdigit():
+                        delay = int(retry_after)
+                logging.warning("Retrying page %s after status %s", url, page.status)
+            except (aiohttp.ClientConnectionError, asyncio.TimeoutError) as e:
+                if attempt == _RETRIES:
+                    logging.error("Error fetching page: %s", e)
+                    return ''
+                logging.warning("Retrying page %s after error: %s", url, e)
+            except aiohttp.ClientError as e:
+                logging.error("Error fetching page: %s", e)
+                return ''
+            await asyncio.sleep(delay)
+        return ''
         
+    @staticmethod
+    def parse_tree(page: str) -> lxml.html.HtmlElement:
+        """
+        Parses the HTML content directly into an lxml element tree.
+
+        The tree can be queried with compiled XPath expressions that run entirely
+        in libxml2.
+
         Args:
             page (str): The HTML content as a string.
-        
+
         Returns:
-            BeautifulSoup: A BeautifulSoup object representing the parsed HTML.
+            lxml.html.HtmlElement: The root element of the parsed document, or an empty
+            `html` element if the page has no content.
+        """
+        if not page:
+            return lxml.html.Element('html')
+        try:
+            return lxml.html.fromstring(page)
+        except lxml.etree.ParserError:
+            # Whitespace or comment-only bodies, which lxml rejects as an empty document
+            return lxml.html.Element('html')
+
+    @staticmethod
+    def stripped_text(element: lxml.html.HtmlElement) -> str:
+        """
+        Joins the stripped text nodes of an lxml element, as BeautifulSoup's
+        `get_text(strip=True)` does.
+
+        Args:
+            element (lxml.html.HtmlElement): The element to read.
+
+        Returns:
+            str: The concatenated text.
+        """
+        return ''.join(text.strip() for text in element.itertext())
+
+    @staticmethod
+    def parse_fast(page: str) -> LexborHTMLParser:
         """
-        return BeautifulSoup(page, 'html.parser')
+        Parses the HTML content with selectolax's Lexbor backend.
+
+        Intended for large, regular listing pages that are queried with CSS selectors only.
+
+        Args:
+            page (str): The HTML content as a string.
+
+        Returns:
+            LexborHTMLParser: A selectolax tree supporting `css` and `css_first` queries.
+        """
+        return LexborHTMLParser(page)
     
+    async def _scrape_pages_async(self, urls: list, extract, session: aiohttp.ClientSession, stream_to=None) -> dict:
+        """
+        Fetches pages on the event loop and extracts them on a process pool.
+
+        All pages are requested concurrently, bounded by the connector limits of
+        `async_session`, and each page is sent to a separate process as soon as its
+        HTML arrives.
+
+        Args:
+            urls (list): The URLs of the pages to scrape.
+            extract (callable): A module-level function mapping the HTML of a page to a
+                columnar batch of quotes. It must be picklable.
+            session (aiohttp.ClientSession): The session created by `async_session`.
+            stream_to (file, optional): A file opened by `_open_stream`. If given, each
+                page's quotes are written to it as soon as they are extracted instead of
+                being collected.
+
+        Returns:
+            dict: A columnar batch of the quotes extracted from all pages, empty when streaming.
+        """
+        loop = asyncio.get_running_loop()
+
+        async def scrape(url, pool):
+            page = await self._aget(url, session)
+            return await loop.run_in_executor(pool, extract, page)
+
+        quotes = self._empty_batch()
+        with ProcessPoolExecutor() as pool:
+            for next_batch in asyncio.as_completed([scrape(url, pool) for url in urls]):
+                batch = await next_batch
+                if stream_to is None:
+                    self._extend_batch(quotes, batch)
+                else:
+                    self._write_jsonl(stream_to, batch)
+
+        return quotes
+
+    @staticmethod
+    def _empty_batch() -> dict:
+        """
+        Creates an empty columnar batch of quotes.
+
+        Quotes are stored as one list per field rather than one dictionary per quote,
+        which avoids a dictionary allocation per quote on large scrapes.
+
+        Returns:
+            dict: A dictionary mapping each quote field to an empty list.
+        """
+        return {field: [] for field in _QUOTE_FIELDS}
+
+    @staticmethod
+    def _extend_batch(batch: dict, other: dict) -> dict:
+        """
+        Appends the quotes of one columnar batch to another in place.
+
+        Authors and tags repeat across pages, so they are interned here. Batches
+        extracted in worker processes arrive as fresh unpickled copies, so interning
+        in the workers alone would not share them in this process.
+
+        Args:
+            batch (dict): The batch to extend.
+            other (dict): The batch whose quotes are appended.
+
+        Returns:
+            dict: The extended batch.
+        """
+        for field, column in other.items():
+            if field == 'author':
+                column = [sys.intern(author) for author in column]
+            elif field == 'tags':
+                column = [sys.intern(tags) if isinstance(tags, str) else [sys.intern(tag) for tag in tags]
+                          for tags in column]
+            batch[field].extend(column)
+        return batch
+
+    @staticmethod
+    def to_dicts(batch: dict) -> list:
+        """
+        Converts a columnar batch of quotes back into a list of dictionaries.
+
+        Args:
+            batch (dict): A batch as returned by the `scrape_page` methods.
+
+        Returns:
+            list: A list of dictionaries, one per quote.
+        """
+        return [dict(zip(batch, row)) for row in zip(*batch.values())]
+
+    @staticmethod
+    def to_records(batch: dict) -> list:
+        """
+        Converts a columnar batch of quotes into a list of `Quote` records.
+
+        Args:
+            batch (dict): A batch as returned by the `scrape_page` methods.
+
+        Returns:
+            list: A list of `Quote` records, one per quote.
+        """
+        return list(map(Quote, *(batch[field] for field in _QUOTE_FIELDS)))
+
     def get_quote(self, block):
         """
         Extracts the quote text from a given HTML block.
@@ -77,7 +361,7 @@ class BaseScraper:
         This method must be implemented in a subclass.
         
         Args:
-            block (BeautifulSoup element): A BeautifulSoup element representing a quote block.
+            block (element): A parsed element representing a quote block.
         
         Raises:
             NotImplementedError: If the method is not implemented in a subclass.
@@ -91,7 +375,7 @@ class BaseScraper:
         This method must be implemented in a subclass.
         
         Args:
-            block (BeautifulSoup element): A BeautifulSoup element containing author information.
+            block (element): A parsed element containing author information.
         
         Raises:
             NotImplementedError: If the method is not implemented in a subclass.
@@ -105,7 +389,7 @@ class BaseScraper:
         This method must be implemented in a subclass.
         
         Args:
-            block (BeautifulSoup element): A BeautifulSoup element containing tags.
+            block (element): A parsed element containing tags.
         
         Raises:
             NotImplementedError: If the method is not implemented in a subclass.
@@ -119,7 +403,7 @@ class BaseScraper:
         This method must be implemented in a subclass.
         
         Args:
-            block (BeautifulSoup element): A BeautifulSoup element containing like information.
+            block (element): A parsed element containing like information.
         
         Raises:
             NotImplementedError: If the method is not implemented in a subclass.
@@ -140,31 +424,95 @@ class BaseScraper:
         """
         raise NotImplementedError("scrape method must be implemented")
     
-    def _save(self, data: list, filename: str):
+    def _save(self, data, filename: str):
         """
-        Saves scraped data to a file in either JSON or pickle format.
+        Saves scraped data to a file in JSON, pickle, MessagePack or Parquet format.
         
         The filename is automatically suffixed with a timestamp.
         
         Args:
-            data (list): The scraped data to be saved.
-            filename (str): The base filename (with `.json` or `.pkl` extension).
+            data (list | dict): The scraped data to be saved, either a list of records
+                (dictionaries or `Quote`) or a columnar batch of quotes.
+            filename (str): The base filename (with `.json`, `.pkl`, `.msgpack` or `.parquet` extension).
         
         Raises:
-            NotImplementedError: If the file format is not JSON or pickle.
+            NotImplementedError: If the file format is not JSON, pickle, MessagePack or Parquet,
+                or is MessagePack and msgspec is not installed.
         """
-        now = datetime.now().strftime("%m_%d_%Y_%H%M%S")
-        filename_split = filename.split('.')
-        file, ext = '.'.join(filename_split[:-1]), filename_split[-1]
-        filename = f'{file}_{now}.{ext}'
+        filename = self._timestamped(filename)
+        ext = os.path.splitext(filename)[1]
         
-        if 'json' in filename:
-            with open(filename, 'w', encoding='utf-8') as f:
-                json.dump(data, f, ensure_ascii=False, indent=4)
+        if ext == '.json':
+            if msgspec is None:
+                with open(filename, 'w', encoding='utf-8') as f:
+                    json.dump(data, f, ensure_ascii=False, indent=2)
+            else:
+                with open(filename, 'wb') as f:
+                    f.write(msgspec.json.format(_JSON_ENCODER.encode(data), indent=2))
+
+        elif ext == '.pkl':
+            with open(filename, 'wb') as f:
+                pickle.dump(data, f, protocol=pickle.HIGHEST_PROTOCOL)
 
-        elif 'pkl' in filename:
+        elif ext == '.msgpack':
+            if msgspec is None:
+                raise NotImplementedError("MessagePack requires msgspec")
             with open(filename, 'wb') as f:
-                pickle.dump(data, f)
+                f.write(msgspec.msgpack.encode(data))
+
+        elif ext == '.parquet':
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+
+            table = pa.table(data) if isinstance(data, dict) else pa.Table.from_pylist(data)
+            pq.write_table(table, filename)
 
         else:
-            raise NotImplementedError("Only json and pickle supported")
+            raise NotImplementedError("Only json, pickle, msgpack and parquet supported")
+
+    def _open_stream(self, filename: str):
+        """
+        Opens a JSON Lines file that quotes are appended to while they are scraped.
+
+        The filename is automatically suffixed with a timestamp, as in `_save`.
+
+        Args:
+            filename (str): The base filename (with `.jsonl` extension).
+
+        Returns:
+            file: The file opened for binary writing.
+
+        Raises:
+            NotImplementedError: If the file format is not JSON Lines.
+        """
+        if not filename.endswith('.jsonl'):
+            raise NotImplementedError("Only jsonl supported for streaming")
+        return open(self._timestamped(filename), 'wb')
+
+    def _write_jsonl(self, f, batch: dict):
+        """
+        Appends a columnar batch of quotes to a JSON Lines file, one quote per line.
+
+        Args:
+            f (file): A file opened by `_open_stream`.
+            batch (dict): The quotes to write.
+        """
+        if msgspec is None:
+            lines = ''.join(json.dumps(quote, ensure_ascii=False) + '\n' for quote in self.to_dicts(batch))
+            f.write(lines.encode('utf-8'))
+        else:
+            f.write(_JSON_ENCODER.encode_lines(self.to_records(batch)))
+
+    @staticmethod
+    def _timestamped(filename: str) -> str:
+        """
+        Suffixes a filename with the current timestamp, keeping its extension.
+
+        Args:
+            filename (str): The filename to suffix.
+
+        Returns:
+            str: The timestamped filename.
+        """
+        base, ext = os.path.splitext(filename)
+        return f'{base}_{datetime.now().strftime(_TIMESTAMP_FORMAT)}{ext}'
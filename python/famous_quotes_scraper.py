@@ -1,7 +1,22 @@
 from base_scraper import BaseScraper
+import sys
+import asyncio
+from lxml import etree
+from lxml.html import HtmlElement
 from urllib.parse import urljoin
-from typing import List, Dict
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import List, Dict, Optional, Tuple, Union
+
+# Built once at import instead of on every lookup
+_TOPIC_LINKS = etree.XPath("//tr[@height='14']/descendant::a[1]")
+_AUTHOR_LINKS = etree.XPath("//tr[@height='15']/descendant::a[1]")
+_STYLE_QUOTE = 'font-size:12px;font-family:Arial;'
+_STYLE_AUTHOR = 'padding-top:2px;'
+_STYLE_TAG = 'padding-top:10px;font-size:19px;font-family:Times New Roman;color:#347070;'
+_TABLE_XPATH = etree.XPath("(//td[@style='padding-left:16px; padding-right:16px;'][@valign='top'])[1]")
+# Matches the quote, author and tag divs of a table in a single pass, in document order
+_FIELDS_XPATH = etree.XPath(
+    ".//div[" + " or ".join(f"@style='{style}'" for style in (_STYLE_QUOTE, _STYLE_AUTHOR, _STYLE_TAG)) + "]"
+)
 
 class FamousQuotesScraper(BaseScraper):
     """
@@ -12,9 +27,14 @@ class FamousQuotesScraper(BaseScraper):
     - Extracting topics and associated URLs
     - Scraping author names and their respective URLs
     - Multi-threaded scraping for efficiency
+
+    Attributes:
+        BASE_URL (str): The root of the site, against which relative links are resolved.
     """
 
-    def scrape_page(self, url: str, save: bool = False, savepath: str = 'quotes_fq.pkl') -> List[Dict[str, str]]:
+    BASE_URL = 'http://www.famousquotesandauthors.com'
+
+    def scrape_page(self, url: str, save: bool = False, savepath: str = 'quotes_fq.pkl') -> Dict[str, list]:
         """
         Scrapes a single page for quotes, extracting relevant details such as the quote, author, tags, and likes.
 
@@ -24,23 +44,11 @@ class FamousQuotesScraper(BaseScraper):
             savepath (str): The path to save the extracted quotes. Must be a .pkl or .json file
 
         Returns:
-            List[Dict[str, str]]: A list of dictionaries containing the quote, author, tags, and likes.
+            Dict[str, list]: A columnar batch with the quote, author, tags, and likes of every quote,
+            see `to_dicts` to get one dictionary per quote.
         """
         page = self.get_page(url)
-        soup = self.parse_page(page)
-        table = soup.find('td', style='padding-left:16px; padding-right:16px;', valign='top')
-
-        quotes = self.get_quote(table)
-        authors = self.get_author(table)
-        likes = None
-        tag = self.get_tags(table)
-
-        assert len(quotes) == len(authors), "Mismatch between quotes and authors count."
-
-        extracted_quotes = [
-            {'quote': quote, 'author': author, 'tags': tag, 'likes': likes}
-            for quote, author in zip(quotes, authors)
-        ]
+        extracted_quotes = _extract_quotes(page)
 
         if save:
             self._save(extracted_quotes, savepath)
@@ -48,69 +56,86 @@ class FamousQuotesScraper(BaseScraper):
         return extracted_quotes
 
     @staticmethod
-    def get_quote(table) -> List[str]:
+    def get_fields(table: Optional[HtmlElement]) -> Tuple[List[str], List[str], str]:
+        """
+        Extracts the quotes, the authors and the topic tag of a table in a single traversal.
+
+        Args:
+            table (lxml element): The table containing the quotes.
+
+        Returns:
+            Tuple[List[str], List[str], str]: The quotes, their authors and the topic tag.
+        """
+        if table is None:
+            return [""], [""], ""
+
+        quotes: List[str] = []
+        authors: List[str] = []
+        tag = None
+        missing_author = False
+        for node in _FIELDS_XPATH(table):
+            style = node.get('style')
+            if style == _STYLE_QUOTE:
+                quotes.append(FamousQuotesScraper.stripped_text(node))
+            elif style == _STYLE_AUTHOR:
+                link = node.find('.//a')
+                if link is None:
+                    missing_author = True
+                else:
+                    authors.append(sys.intern(FamousQuotesScraper.stripped_text(link)))
+            elif tag is None:
+                tag = FamousQuotesScraper.stripped_text(node)
+
+        if missing_author:
+            authors = [""]
+        return quotes, authors, sys.intern(tag.partition(' Quote')[0]) if tag is not None else ""
+
+    @staticmethod
+    def get_quote(table: Optional[HtmlElement]) -> List[str]:
         """
         Extracts quote text from a given HTML table.
 
         Args:
-            table (BeautifulSoup element): The table containing quotes.
+            table (lxml element): The table containing quotes.
 
         Returns:
             List[str]: A list of extracted quotes.
         """
-        quotes = []
-        try:
-            for quote in table.find_all('div', style='font-size:12px;font-family:Arial;'):
-                quotes.append(quote.get_text(strip=True))
-        except AttributeError:
-            return [""]
-        return quotes
+        return FamousQuotesScraper.get_fields(table)[0]
 
     @staticmethod
-    def get_author(table) -> List[str]:
+    def get_author(table: Optional[HtmlElement]) -> List[str]:
         """
         Extracts author names from a given HTML table.
 
         Args:
-            table (BeautifulSoup element): The table containing author names.
+            table (lxml element): The table containing author names.
 
         Returns:
             List[str]: A list of extracted author names.
         """
-        authors = []
-        try:
-            for author in table.find_all('div', style='padding-top:2px;'):
-                author_name = author.find('a').get_text(strip=True)
-                authors.append(author_name)
-        except AttributeError:
-            return [""]
-        return authors
+        return FamousQuotesScraper.get_fields(table)[1]
 
     @staticmethod
-    def get_tags(table) -> str:
+    def get_tags(table: Optional[HtmlElement]) -> str:
         """
         Extracts the topic tag from a given HTML table.
 
         Args:
-            table (BeautifulSoup element): The table containing tag information.
+            table (lxml element): The table containing tag information.
 
         Returns:
             str: The extracted topic tag.
         """
-        try:
-            tag = table.find('div', style='padding-top:10px;font-size:19px;font-family:Times New Roman;color:#347070;').get_text(strip=True)
-        except AttributeError:
-            return ""
-        idx = tag.index(' Quote')
-        return tag[:idx]
+        return FamousQuotesScraper.get_fields(table)[2]
 
     @staticmethod
-    def get_likes(table) -> None:
+    def get_likes(table: Optional[HtmlElement]) -> None:
         """
         Extracts the number of likes for a quote (not available in this scraper).
 
         Args:
-            table (BeautifulSoup element): The table containing like information.
+            table (lxml element): The table containing like information.
 
         Returns:
             None: Since likes are not available on this website.
@@ -128,16 +153,13 @@ class FamousQuotesScraper(BaseScraper):
         Returns:
             List[Dict[str, str]]: A list of dictionaries containing topic names and URLs.
         """
-        url = 'http://www.famousquotesandauthors.com/quotes_by_topic.html'
-        base_quote_url = 'http://www.famousquotesandauthors.com'
+        url = self.BASE_URL + '/quotes_by_topic.html'
         response = self.get_page(url)
-        soup = self.parse_page(response)
+        tree = self.parse_tree(response)
 
         topics = []
-        for topic_block in soup.find_all('tr', height='14'):
-            topic = topic_block.find('a').get_text(strip=True)
-            topic_url = urljoin(base_quote_url, topic_block.find('a').get('href'))
-            topics.append({'topic': topic, 'url': topic_url})
+        for link in _TOPIC_LINKS(tree):
+            topics.append({'topic': self.stripped_text(link), 'url': self._resolve(link.get('href'))})
 
         if save:
             self._save(topics, savepath)
@@ -155,46 +177,109 @@ class FamousQuotesScraper(BaseScraper):
         Returns:
             List[Dict[str, str]]: A list of dictionaries containing author names and URLs.
         """
-        url = 'http://www.famousquotesandauthors.com/quotes_by_author.html'
-        base_author_url = 'http://www.famousquotesandauthors.com'
+        url = self.BASE_URL + '/quotes_by_author.html'
         response = self.get_page(url)
-        soup = self.parse_page(response)
+        tree = self.parse_tree(response)
 
         authors = []
-        for author_block in soup.find_all('tr', height='15'):
-            author = author_block.find('a').get_text(strip=True)
-            author_url = urljoin(base_author_url, author_block.find('a').get('href'))
-            authors.append({'author': author, 'url': author_url})
+        for link in _AUTHOR_LINKS(tree):
+            authors.append({'author': self.stripped_text(link), 'url': self._resolve(link.get('href'))})
 
         if save:
             self._save(authors, savepath)
 
         return authors
 
-    def scrape_many_pages(self, urls: List[str], save: bool = False, savepath: str = 'quotes_fq.pkl') -> List[Dict[str, str]]:
+    def _resolve(self, href: Optional[str]) -> str:
+        """
+        Resolves a link found on the site to an absolute URL.
+
+        Root-relative links, which the site uses almost exclusively, are concatenated to
+        `BASE_URL` directly and absolute links are returned as they are; anything else
+        goes through `urljoin`.
+
+        Args:
+            href (str, optional): The link as found in the page, or None if the anchor has no
+                href, which resolves to `BASE_URL` itself.
+
+        Returns:
+            str: The absolute URL.
+        """
+        href = href or ''
+        if href.startswith('/') and not href.startswith('//'):
+            return self.BASE_URL + href
+        if href.startswith('http'):
+            return href
+        return urljoin(self.BASE_URL, href)
+
+    def scrape_many_pages(self, urls: List[str], save: bool = False, savepath: str = 'quotes_fq.pkl', stream: bool = False) -> Union[Dict[str, list], str]:
         """
         Scrapes multiple pages concurrently and extracts quotes.
 
+        This is a synchronous wrapper around `scrape_many_pages_async` and cannot be
+        called from within a running event loop.
+
         Args:
             urls (List[str]): A list of URLs to scrape.
             save (bool): If True, saves the extracted data to a pickle file.
             savepath (str): The path to save the extracted data. Must be a .pkl or .json file.
+            stream (bool): If True, quotes are appended to `savepath` as JSON Lines while pages
+                complete instead of being kept in memory, and `save` is ignored. `savepath`
+                must then be a .jsonl file.
 
         Returns:
-            List[Dict[str, str]]: A list of dictionaries containing quote data from all pages.
+            Union[Dict[str, list], str]: A columnar batch of quote data from all pages, or the
+            path of the written file when streaming.
         """
-        quotes = []
-        futures = []
+        if stream:
+            with self._open_stream(savepath) as f:
+                asyncio.run(self.scrape_many_pages_async(urls, stream_to=f))
+            return f.name
 
-        with ThreadPoolExecutor(max_workers=10) as executor:
-            for url in urls:
-                future = executor.submit(self.scrape_page, url)
-                futures.append(future)
-
-            for future in as_completed(futures):
-                quotes.extend(future.result())
+        quotes = asyncio.run(self.scrape_many_pages_async(urls))
 
         if save:
             self._save(quotes, savepath)
 
         return quotes
+
+    async def scrape_many_pages_async(self, urls: List[str], stream_to=None) -> Dict[str, list]:
+        """
+        Asynchronously scrapes multiple pages and extracts quotes.
+
+        Args:
+            urls (List[str]): A list of URLs to scrape.
+            stream_to (file, optional): A file opened by `_open_stream`. If given, each
+                page's quotes are written to it as soon as they are extracted instead of
+                being collected.
+
+        Returns:
+            Dict[str, list]: A columnar batch of quote data from all pages, empty when streaming.
+        """
+        async with self.async_session() as session:
+            return await self._scrape_pages_async(urls, _extract_quotes, session, stream_to=stream_to)
+
+
+def _extract_quotes(page: str) -> Dict[str, list]:
+    """
+    Extracts the quotes from the HTML of a FamousQuotesAndAuthors topic page.
+
+    Kept at module level so it can be pickled and run inside a process pool.
+
+    Args:
+        page (str): The HTML content as a string.
+
+    Returns:
+        Dict[str, list]: A columnar batch with the quote, author, tags, and likes of every quote.
+    """
+    tables = _TABLE_XPATH(FamousQuotesScraper.parse_tree(page))
+    quotes, authors, tag = FamousQuotesScraper.get_fields(tables[0] if tables else None)
+
+    assert len(quotes) == len(authors), "Mismatch between quotes and authors count."
+
+    return {
+        'quote': quotes,
+        'author': authors,
+        'tags': [tag] * len(quotes),
+        'likes': [None] * len(quotes),
+    }
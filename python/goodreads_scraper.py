@@ -1,6 +1,19 @@
 from base_scraper import BaseScraper
-from concurrent.futures import ThreadPoolExecutor, as_completed
-from typing import List, Dict
+import sys
+import asyncio
+from lxml import etree
+from lxml.html import HtmlElement
+from typing import List, Dict, Optional, Union
+
+# Built once at import instead of on every lookup. The likes expression uses
+# string() so libxml2 hands back plain text and no element is proxied to Python.
+_TOPICS = etree.XPath("//li[contains(concat(' ', normalize-space(@class), ' '), ' greyText ')]")
+_BLOCKS = etree.XPath(".//div[@class='quote mediumText']")
+_QUOTE_TEXT = etree.XPath("(.//div[@class='quoteText'])[1]")
+_AUTHOR = etree.XPath("(.//span[@class='authorOrTitle'])[1]")
+_FOOTER = etree.XPath(".//div[@class='quoteFooter']")
+_LIKES = etree.XPath("string(.//a[@class='smallText'])", smart_strings=False)
+_TAGS = etree.XPath(".//a/text()", smart_strings=False)
 
 class GoodReadsScraper(BaseScraper):
     """
@@ -10,9 +23,14 @@ class GoodReadsScraper(BaseScraper):
     - Scraping individual pages for quotes
     - Extracting topics and associated URLs
     - Multi-threaded scraping for multiple pages concurrently
+
+    Attributes:
+        BASE_URL (str): The root of the site, prefixed to the relative links it serves.
     """
 
-    def scrape_page(self, url: str, save: bool = False, savepath: str = 'quotes_qr.pkl') -> List[Dict[str, str]]:
+    BASE_URL = 'https://www.goodreads.com'
+
+    def scrape_page(self, url: str, save: bool = False, savepath: str = 'quotes_qr.pkl') -> Dict[str, list]:
         """
         Scrapes a single page for quotes, extracting relevant details such as the quote, author, tags, and likes.
 
@@ -22,19 +40,11 @@ class GoodReadsScraper(BaseScraper):
             savepath (str): The path to save the extracted quotes. Must be a .pkl or .json file
 
         Returns:
-            List[Dict[str, str]]: A list of dictionaries containing the quote, author, tags, and likes.
+            Dict[str, list]: A columnar batch with the quote, author, tags, and likes of every quote,
+            see `to_dicts` to get one dictionary per quote.
         """
         page = self.get_page(url)
-        soup = self.parse_page(page)
-        quotes = []
-
-        for block in soup.find_all('div', class_='quote mediumText'):
-            quotes.append({
-                'quote': self.get_quote(block),
-                'author': self.get_author(block),
-                'tags': self.get_tags(block),
-                'likes': self.get_likes(block)
-            })
+        quotes = _extract_blocks(self.parse_tree(page))
 
         if save:
             self._save(quotes, savepath)
@@ -42,95 +52,136 @@ class GoodReadsScraper(BaseScraper):
         return quotes
 
     @staticmethod
-    def get_quote(block) -> str:
+    def get_quote(block: HtmlElement) -> str:
         """
         Extracts the quote text from a quote block.
 
         Args:
-            block (BeautifulSoup element): The block containing the quote.
+            block (lxml element): The block containing the quote.
 
         Returns:
             str: The extracted quote text.
         """
-        return block.find('div', class_='quoteText').get_text(strip=True)
+        quote = _QUOTE_TEXT(block)
+        return GoodReadsScraper.stripped_text(quote[0]) if quote else ''
     
     @staticmethod
-    def get_author(block) -> str:
+    def get_author(block: HtmlElement) -> str:
         """
         Extracts the author of the quote.
 
         Args:
-            block (BeautifulSoup element): The block containing the author.
+            block (lxml element): The block containing the author.
 
         Returns:
             str: The extracted author name, or 'Unknown' if not found.
         """
-        author_tag = block.find('span', class_='authorOrTitle')
-        return author_tag.get_text(strip=True) if author_tag else 'Unknown'
+        author = _AUTHOR(block)
+        return sys.intern(GoodReadsScraper.stripped_text(author[0]) if author else 'Unknown')
 
     @staticmethod
-    def get_likes(block) -> int:
+    def get_footer(block: HtmlElement) -> Optional[HtmlElement]:
+        """
+        Finds the footer of a quote block, which holds both its likes and its tags.
+
+        Args:
+            block (lxml element): The quote block.
+
+        Returns:
+            Optional[lxml element]: The footer, or None if the block has none.
+        """
+        footers = _FOOTER(block)
+        return footers[0] if footers else None
+
+    @staticmethod
+    def get_likes(block: HtmlElement, footer: Optional[HtmlElement] = None) -> int:
         """
         Extracts the number of likes for a quote.
 
         Args:
-            block (BeautifulSoup element): The block containing like information.
+            block (lxml element): The block containing like information.
+            footer (lxml element, optional): The footer of the block, if already looked up.
 
         Returns:
             int: The number of likes as an integer.
         """
-        likes_box = block.find('div', class_='quoteFooter')
-        likes_tag = likes_box.find('a', class_='smallText') if likes_box else None
-        return int(likes_tag.get_text(strip=True).split(' ')[0]) if likes_tag else 0
+        if footer is None:
+            footer = GoodReadsScraper.get_footer(block)
+        if footer is None:
+            return 0
+        likes = _LIKES(footer).strip()
+        return int(likes.split(' ')[0]) if likes else 0
     
     @staticmethod
-    def get_tags(block) -> List[str]:
+    def get_tags(block: HtmlElement, footer: Optional[HtmlElement] = None) -> List[str]:
         """
         Extracts the tags associated with a quote.
 
         Args:
-            block (BeautifulSoup element): The block containing tags.
+            block (lxml element): The block containing tags.
+            footer (lxml element, optional): The footer of the block, if already looked up.
 
         Returns:
             List[str]: A list of tag strings.
         """
-        tags = []
-        tags_block = block.find('div', class_='quoteFooter')
-        if tags_block:
-            for tag in tags_block.find_all('a'):
-                tags.append(tag.get_text())
+        if footer is None:
+            footer = GoodReadsScraper.get_footer(block)
+        if footer is None:
+            return []
+        tags = [sys.intern(tag) for tag in _TAGS(footer)]
         return tags[:-1] if tags else []
 
-    def scrape_many_pages(self, urls: List[str], start_page: int, end_page: int, save: bool = False, savepath: str = 'quotes_qr.pkl') -> List[Dict[str, str]]:
+    def scrape_many_pages(self, urls: List[str], start_page: int, end_page: int, save: bool = False, savepath: str = 'quotes_qr.pkl', stream: bool = False) -> Union[Dict[str, list], str]:
         """
         Scrapes multiple pages concurrently and extracts quotes.
 
+        This is a synchronous wrapper around `scrape_many_pages_async` and cannot be
+        called from within a running event loop.
+
         Args:
             urls (List[str]): A list of URLs to scrape.
             start_page (int): The starting page number for pagination.
             end_page (int): The last page number to scrape.
             save (bool): If True, saves the extracted data to a pickle file.
             savepath (str): The path to save the quotes pickle file. Must be a .pkl or .json file
+            stream (bool): If True, quotes are appended to `savepath` as JSON Lines while pages
+                complete instead of being kept in memory, and `save` is ignored. `savepath`
+                must then be a .jsonl file.
 
         Returns:
-            List[Dict[str, str]]: A list of dictionaries containing quote data from all pages.
+            Union[Dict[str, list], str]: A columnar batch of quote data from all pages, or the
+            path of the written file when streaming.
         """
-        quotes = []
-        futures = []
-
-        with ThreadPoolExecutor(max_workers=10) as executor:
-            for url in urls:
-                for page in self.__generate_pages(url, start_page, end_page):
-                    future = executor.submit(self.scrape_page, page)
-                    futures.append(future)
+        if stream:
+            with self._open_stream(savepath) as f:
+                asyncio.run(self.scrape_many_pages_async(urls, start_page, end_page, stream_to=f))
+            return f.name
 
-            for future in as_completed(futures):
-                quotes.extend(future.result())
+        quotes = asyncio.run(self.scrape_many_pages_async(urls, start_page, end_page))
 
         if save:
             self._save(quotes, savepath)
 
         return quotes
+
+    async def scrape_many_pages_async(self, urls: List[str], start_page: int, end_page: int, stream_to=None) -> Dict[str, list]:
+        """
+        Asynchronously scrapes multiple pages and extracts quotes.
+
+        Args:
+            urls (List[str]): A list of URLs to scrape.
+            start_page (int): The starting page number for pagination.
+            end_page (int): The last page number to scrape.
+            stream_to (file, optional): A file opened by `_open_stream`. If given, each
+                page's quotes are written to it as soon as they are extracted instead of
+                being collected.
+
+        Returns:
+            Dict[str, list]: A columnar batch of quote data from all pages, empty when streaming.
+        """
+        pages = [page for url in urls for page in self.__generate_pages(url, start_page, end_page)]
+        async with self.async_session() as session:
+            return await self._scrape_pages_async(pages, _extract_quotes, session, stream_to=stream_to)
     
     def scrape_topics(self, save: bool = False, savepath: str = 'topics_qr.pkl') -> List[Dict[str, str]]:
         """
@@ -143,15 +194,15 @@ class GoodReadsScraper(BaseScraper):
         Returns:
             List[Dict[str, str]]: A list of dictionaries containing topic names and URLs.
         """
-        url = 'https://www.goodreads.com/quotes'
+        url = self.BASE_URL + '/quotes'
         response = self.get_page(url)
-        soup = self.parse_page(response)
+        tree = self.parse_tree(response)
         topics = []
 
-        for topic in soup.find_all('li', class_='greyText'):
-            topic_of_quote = topic.get_text(strip=True).split(' ')[0]
-            topic_url = topic.find('a').get('href')
-            topic_url = 'https://www.goodreads.com' + topic_url
+        for topic in _TOPICS(tree):
+            topic_of_quote = self.stripped_text(topic).partition(' ')[0]
+            topic_url = topic.find('.//a').get('href')
+            topic_url = self.BASE_URL + topic_url
             topics.append({'topic': topic_of_quote, 'url': topic_url})
 
         if save:
@@ -174,3 +225,40 @@ class GoodReadsScraper(BaseScraper):
         base_url = f"{url}?page="
         for i in range(start_page, end_page + 1):
             yield base_url + str(i)
+
+
+def _extract_quotes(page: str) -> Dict[str, list]:
+    """
+    Extracts every quote block from the HTML of a Goodreads page.
+
+    Kept at module level so it can be pickled and run inside a process pool.
+
+    Args:
+        page (str): The HTML content as a string.
+
+    Returns:
+        Dict[str, list]: A columnar batch with the quote, author, tags, and likes of every quote.
+    """
+    return _extract_blocks(GoodReadsScraper.parse_tree(page))
+
+
+def _extract_blocks(tree: HtmlElement) -> Dict[str, list]:
+    """
+    Extracts every quote block from a parsed Goodreads page.
+
+    Args:
+        tree (lxml element): The root of the parsed page.
+
+    Returns:
+        Dict[str, list]: A columnar batch with the quote, author, tags, and likes of every quote.
+    """
+    quotes = BaseScraper._empty_batch()
+
+    for block in _BLOCKS(tree):
+        footer = GoodReadsScraper.get_footer(block)
+        quotes['quote'].append(GoodReadsScraper.get_quote(block))
+        quotes['author'].append(GoodReadsScraper.get_author(block))
+        quotes['tags'].append(GoodReadsScraper.get_tags(block, footer))
+        quotes['likes'].append(GoodReadsScraper.get_likes(block, footer))
+
+    return quotes